@@ -1,11 +1,52 @@
 import asyncio
 import aiohttp
-import json
+import functools
+import hashlib
+import orjson
 import logging
+import re
+import sqlite3
+import time
 import uuid
 from datetime import datetime
 from typing import Optional
-from config import GOOGLE_API_KEY, ENABLE_AI_EXPLANATIONS, GEMINI_API_URL, GEMINI_MODEL
+from config import (GOOGLE_API_KEY, ENABLE_AI_EXPLANATIONS, GEMINI_API_URL, GEMINI_MODEL, GEMINI_BATCH_SIZE,
+                    GEMINI_CACHE_URL, GEMINI_CACHE_TTL, ENABLE_CONTEXT_CACHE, AI_CACHE_FILE, QUIZ_DATA_FILE, OPTION_LABELS)
+
+# Matches each "### კითხვა N ... (ID: X)" section of the AI response (the ID must be on the header line): number, question ID, body
+_SECTION_RE = re.compile(r"### კითხვა\s*(\d+)?[^\n]*?\(ID:\s*(\d+)\)(.*?)(?=### კითხვა|\Z)", re.DOTALL)
+
+# Static system prompt shared by every batch request; uploaded once to Gemini context cache when possible
+_BATCH_PREAMBLE = """თქვენ ხართ IT განათლების ექსპერტი და პროგრამირების ინსტრუქტორი. ქვემოთ მოცემული ყველა კითხვა დაკავშირებულია ინფორმაციულ ტექნოლოგიებთან, პროგრამირებასთან, კომპიუტერულ მეცნიერებასთან და ქსელურ ტექნოლოგიებთან.
+
+გთხოვთ ახსნათ ქართულ ენაზე რატომ არის არასწორი თითოეული მოცემული პასუხი, გამოიყენეთ IT ტერმინოლოგია და ტექნიკური ცოდნა.
+
+კითხვები მოცემულია JSON ხაზებად, თითო ხაზი — ერთი კითხვა: i — კითხვის ნომერი, id — კითხვის ID, q — კითხვის ტექსტი, opts — ვარიანტები, user — მოსწავლის პასუხი, correct — სწორი პასუხი.
+
+**მოთხოვნები:**
+1. თითოეული კითხვისთვის მოკლე, ლაკონური ახსნა
+2. მოიცავდეს რატომ არის სწორი სწორი პასუხი (IT ტექნიკური თვალსაზრისით)
+3. რატომ არის არასწორი მოსწავლის პასუხი (ტექნიკური განმარტებით)
+4. გამოიყენეთ markdown ფორმატირება
+5. მაქსიმუმ 2-3 წინადადება თითო კითხვაზე
+6. გამოიყენეთ ქართული IT ტერმინოლოგია და ტექნიკური ენა
+
+**ფორმატი:**
+```
+### კითხვა 1 (ID: X)
+**სწორი პასუხი (Y):** [IT ტექნიკური ახსნა]
+**რატომაა არასწორი (Z):** [ტექნიკური განმარტება]
+
+### კითხვა 2 (ID: X)
+...
+```"""
+
+# Seconds to wait before retrying a context cache upload after a transient failure
+_CONTEXT_CACHE_BACKOFF = 60
+
+# Context cache lifetime (GEMINI_CACHE_TTL is e.g. "3600s"); the handle is replaced this many seconds early
+_CONTEXT_CACHE_TTL = float(GEMINI_CACHE_TTL.rstrip("s"))
+_CONTEXT_CACHE_REFRESH_MARGIN = 60
 
 # Setup logging for API requests
 logger = logging.getLogger(__name__)
@@ -23,175 +64,303 @@ class AIExplanationService:
         self.enabled = ENABLE_AI_EXPLANATIONS and bool(self.api_key)
         self.request_count = 0
         self.total_questions_processed = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._cached_content: Optional[str] = None
+        self._context_cache_supported = ENABLE_CONTEXT_CACHE
+        self._context_cache_lock = asyncio.Lock()
+        self._context_cache_retry_at = 0.0
+        self._cached_content_expires_at = 0.0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._cache = sqlite3.connect(AI_CACHE_FILE, check_same_thread=False)
+        self._cache.execute("CREATE TABLE IF NOT EXISTS explanations(key TEXT PRIMARY KEY, explanation TEXT, ts INTEGER)")
+        self._cache.commit()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=20, limit_per_host=10, ttl_dns_cache=300, keepalive_timeout=75)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60))
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def get_batch_explanations(self, incorrect_questions: list) -> dict:
         """Generate AI explanations for multiple incorrect answers in one request"""
+        explanations = {}
+        async for batch in self.stream_batch_explanations(incorrect_questions):
+            explanations.update(batch)
+        return explanations
+    
+    async def stream_batch_explanations(self, incorrect_questions: list):
+        """Yield explanation dicts as they become available: cached ones first, then each Gemini batch"""
+        # Compute each question key once and pass (question, key) pairs all the way down
+        keyed = [(q, self._get_question_key(q)) for q in incorrect_questions]
+        
         if not self.enabled or not incorrect_questions:
-            logger.info(f"AI disabled or no questions. Questions count: {len(incorrect_questions)}")
-            return {self._get_question_key(q): self._get_default_explanation(q["user_answer"], q["correct_answer"]) 
-                    for q in incorrect_questions}
+            logger.info("AI disabled or no questions. Questions count: %d", len(incorrect_questions))
+            yield self._get_default_explanations(keyed)
+            return
+        
+        # Serve previously generated explanations from the persistent cache
+        explanations = self._get_cached_explanations(keyed)
+        misses = [(q, key) for q, key in keyed if key not in explanations]
+        logger.info("💾 Cache hits: %d, misses: %d", len(explanations), len(misses))
+        
+        if explanations:
+            yield explanations
         
+        if misses:
+            # Shard large batches into parallel requests sharing the same session
+            chunks = [misses[i:i + GEMINI_BATCH_SIZE] for i in range(0, len(misses), GEMINI_BATCH_SIZE)]
+            for shard in asyncio.as_completed([self._coalesced_batch(c) for c in chunks]):
+                yield await shard
+    
+    async def _coalesced_batch(self, keyed_questions: list) -> dict:
+        """Run one Gemini batch, sharing the result with an identical batch already in flight"""
+        sig = hashlib.sha1("|".join(sorted(key for _, key in keyed_questions)).encode()).hexdigest()
+        task = self._inflight.get(sig)
+        if task is None:
+            # Run as a task so other waiters still get the result if the first caller disconnects
+            task = asyncio.ensure_future(self._generate_and_store(keyed_questions))
+            self._inflight[sig] = task
+            task.add_done_callback(lambda _: self._inflight.pop(sig, None))
+        else:
+            logger.info("🔗 Joining in-flight Gemini batch %s", sig[:8])
+        return await asyncio.shield(task)
+    
+    async def _generate_and_store(self, keyed_questions: list) -> dict:
+        """Run one Gemini batch and persist its explanations (once per shard, even if callers disconnect)"""
+        generated = await self._single_batch(keyed_questions)
+        self._store_explanations(generated, keyed_questions)
+        return generated
+    
+    async def _single_batch(self, keyed_questions: list, retry: bool = True) -> dict:
+        """Request explanations for one batch of questions from Gemini API"""
         # Generate unique request ID
         request_id = str(uuid.uuid4())[:8]
         
-        # Log request details
-        self.request_count += 1
-        self.total_questions_processed += len(incorrect_questions)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Log request details (a cache-refresh retry is the same batch, so it isn't counted again)
+        if retry:
+            self.request_count += 1
+            self.total_questions_processed += len(keyed_questions)
+        start = time.monotonic()
         
-        logger.info(f"🚀 GEMINI API REQUEST #{self.request_count} [ID: {request_id}]")
-        logger.info(f"📅 Time: {timestamp}")
-        logger.info(f"🤖 Model: {GEMINI_MODEL}")
-        logger.info(f"❓ Questions in this batch: {len(incorrect_questions)}")
-        logger.info(f"📊 Total questions processed so far: {self.total_questions_processed}")
-        logger.info(f"🔧 API Key configured: {'Yes' if self.api_key else 'No'}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🚀 GEMINI API REQUEST #%d [ID: %s]", self.request_count, request_id)
+            logger.info("📅 Time: %s", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            logger.info("🤖 Model: %s", GEMINI_MODEL)
+            logger.info("❓ Questions in this batch: %d", len(keyed_questions))
+            logger.info("📊 Total questions processed so far: %d", self.total_questions_processed)
+            logger.info("🔧 API Key configured: %s", 'Yes' if self.api_key else 'No')
         
         try:
-            prompt = self._create_batch_prompt(incorrect_questions)
+            cached_content = await self._get_cached_content()
+            prompt = self._create_batch_prompt([q for q, _ in keyed_questions], include_preamble=cached_content is None)
             
             # Log prompt size
             prompt_size = len(prompt)
-            logger.info(f"📝 Prompt size: {prompt_size} characters")
+            logger.info("📝 Prompt size: %d characters (preamble cached: %s)", prompt_size, 'Yes' if cached_content else 'No')
             
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Content-Type': 'application/json',
-                }
-                
+            session = await self._get_session()
+            headers = {
+                'Content-Type': 'application/json',
+            }
+            
+            payload = {
+                "contents": [{
+                    "role": "user",
+                    "parts": [{
+                        "text": prompt
+                    }]
+                }]
+            }
+            if cached_content:
+                payload["cachedContent"] = cached_content
+            
+            url = f"{GEMINI_API_URL}?key={self.api_key}"
+            
+            logger.info("🌐 Sending request to Gemini API... [ID: %s]", request_id)
+            
+            async with session.post(url, headers=headers, data=orjson.dumps(payload)) as response:
+                if response.status == 200:
+                    # Accumulate the body as chunks arrive instead of buffering it via response.json()
+                    raw = bytearray()
+                    async for chunk in response.content.iter_chunked(65536):
+                        raw.extend(chunk)
+                    data = orjson.loads(bytes(raw))
+                    if data.get('candidates') and len(data['candidates']) > 0:
+                        content = data['candidates'][0].get('content', {})
+                        if content.get('parts') and len(content['parts']) > 0:
+                            ai_response = content['parts'][0].get('text', '').strip()
+                            
+                            if logger.isEnabledFor(logging.INFO):
+                                response_size = len(ai_response)
+                                logger.info("✅ SUCCESS in %.2fs [ID: %s]", time.monotonic() - start, request_id)
+                                logger.info("📄 Response size: %d characters", response_size)
+                                logger.info("💰 Cost estimate: ~$%.4f", self._estimate_cost(prompt_size, response_size))
+                                logger.info("🏁 REQUEST #%d COMPLETED [ID: %s]", self.request_count, request_id)
+                            
+                            return self._parse_batch_response(ai_response, keyed_questions)
+                elif response.status in (403, 404) and cached_content and retry:
+                    # Cached preamble expired or missing (Gemini reports it as 403 or 404); retry with a fresh one
+                    logger.info("♻️ Context cache expired, refreshing [ID: %s]", request_id)
+                    await self._invalidate_cached_content(cached_content)
+                    return await self._single_batch(keyed_questions, retry=False)
+                else:
+                    error_text = await response.text()
+                    logger.error("❌ API ERROR after %.2fs [ID: %s]", time.monotonic() - start, request_id)
+                    logger.error("🔴 Status: %d", response.status)
+                    logger.error("📋 Error: %s", error_text)
+                    
+                    return self._get_default_explanations(keyed_questions)
+                    
+        except Exception as e:
+            logger.error("💥 EXCEPTION: %s", e)
+        
+        return self._get_default_explanations(keyed_questions)
+    
+    async def _get_cached_content(self) -> Optional[str]:
+        """Upload the static preamble to Gemini context cache once and return its handle"""
+        async with self._context_cache_lock:
+            if self._cached_content is not None and time.monotonic() >= self._cached_content_expires_at:
+                # Replace the handle shortly before Gemini expires it; the old one lapses on its own
+                logger.info("♻️ Context cache %s about to expire, refreshing", self._cached_content)
+                self._cached_content = None
+            if (self._cached_content is None and self._context_cache_supported
+                    and time.monotonic() >= self._context_cache_retry_at):
+                session = await self._get_session()
                 payload = {
+                    "model": f"models/{GEMINI_MODEL}",
                     "contents": [{
+                        "role": "user",
                         "parts": [{
-                            "text": prompt
+                            "text": _BATCH_PREAMBLE
                         }]
-                    }]
+                    }],
+                    "ttl": GEMINI_CACHE_TTL
                 }
-                
-                url = f"{GEMINI_API_URL}?key={self.api_key}"
-                
-                logger.info(f"🌐 Sending request to Gemini API... [ID: {request_id}]")
-                
-                async with session.post(url, headers=headers, json=payload) as response:
-                    response_time = datetime.now().strftime("%H:%M:%S")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('candidates') and len(data['candidates']) > 0:
-                            content = data['candidates'][0].get('content', {})
-                            if content.get('parts') and len(content['parts']) > 0:
-                                ai_response = content['parts'][0].get('text', '').strip()
-                                response_size = len(ai_response)
-                                
-                                logger.info(f"✅ SUCCESS at {response_time} [ID: {request_id}]")
-                                logger.info(f"📄 Response size: {response_size} characters")
-                                logger.info(f"💰 Cost estimate: ~${self._estimate_cost(prompt_size, response_size):.4f}")
-                                logger.info(f"🏁 REQUEST #{self.request_count} COMPLETED [ID: {request_id}]")
-                                
-                                return self._parse_batch_response(ai_response, incorrect_questions)
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"❌ API ERROR at {response_time} [ID: {request_id}]")
-                        logger.error(f"🔴 Status: {response.status}")
-                        logger.error(f"📋 Error: {error_text}")
-                        
-                        return {self._get_question_key(q): self._get_default_explanation(q["user_answer"], q["correct_answer"]) 
-                                for q in incorrect_questions}
-                        
-        except Exception as e:
-            logger.error(f"💥 EXCEPTION: {str(e)}")
-            return {self._get_question_key(q): self._get_default_explanation(q["user_answer"], q["correct_answer"]) 
-                    for q in incorrect_questions}
+                url = f"{GEMINI_CACHE_URL}?key={self.api_key}"
+                uploaded_at = time.monotonic()
+                try:
+                    async with session.post(url, headers={'Content-Type': 'application/json'}, data=orjson.dumps(payload)) as response:
+                        if response.status == 200:
+                            self._cached_content = orjson.loads(await response.read())["name"]
+                            self._cached_content_expires_at = uploaded_at + _CONTEXT_CACHE_TTL - _CONTEXT_CACHE_REFRESH_MARGIN
+                            logger.info("🗄️ Context cache created: %s", self._cached_content)
+                        elif 400 <= response.status < 500 and response.status not in (408, 429):
+                            # e.g. preamble below the model's minimum cacheable size; send it inline from now on
+                            self._context_cache_supported = False
+                            logger.warning("⚠️ Context cache unavailable (status %d), sending preamble inline", response.status)
+                        else:
+                            # Transient failure (rate limit / server error); retry after a backoff
+                            self._context_cache_retry_at = time.monotonic() + _CONTEXT_CACHE_BACKOFF
+                            logger.warning("⚠️ Context cache request failed (status %d), retrying in %ds",
+                                           response.status, _CONTEXT_CACHE_BACKOFF)
+                except Exception as e:
+                    # Don't let every shard wait on a timing-out upload while holding the lock
+                    self._context_cache_retry_at = time.monotonic() + _CONTEXT_CACHE_BACKOFF
+                    logger.warning("⚠️ Context cache request failed: %s, retrying in %ds", e, _CONTEXT_CACHE_BACKOFF)
+            return self._cached_content
+    
+    async def _invalidate_cached_content(self, cached_content: str):
+        """Drop the context cache handle, unless another shard has already replaced it"""
+        async with self._context_cache_lock:
+            if self._cached_content == cached_content:
+                self._cached_content = None
+    
+    def _get_cache_key(self, question_info: dict, key: str) -> str:
+        """Generate persistent cache key, scoped to the quiz file and the question's current text/options"""
+        question = question_info["question_data"]
+        content_hash = hashlib.sha1(orjson.dumps([question["question"], question["options"]])).hexdigest()[:12]
+        return f"{QUIZ_DATA_FILE}:{key}:{content_hash}"
+    
+    def _get_cached_explanations(self, keyed_questions: list) -> dict:
+        """Look up previously generated explanations in the persistent cache"""
+        explanations = {}
+        for q_info, key in keyed_questions:
+            row = self._cache.execute(
+                "SELECT explanation FROM explanations WHERE key=?", (self._get_cache_key(q_info, key),)
+            ).fetchone()
+            if row:
+                explanations[key] = row[0]
+        return explanations
+    
+    def _store_explanations(self, explanations: dict, keyed_questions: list):
+        """Persist AI generated explanations (default fallbacks are not cached)"""
+        now = int(time.time())
+        rows = []
+        for q_info, key in keyed_questions:
+            explanation = explanations.get(key)
+            if explanation and explanation != self._get_default_explanation(q_info["user_answer"], q_info["correct_answer"]):
+                rows.append((self._get_cache_key(q_info, key), explanation, now))
+        if rows:
+            self._cache.executemany("INSERT OR REPLACE INTO explanations VALUES (?, ?, ?)", rows)
+            self._cache.commit()
+    
+    def _get_default_explanations(self, keyed_questions: list) -> dict:
+        """Default explanations for (question, key) pairs when AI is unavailable"""
+        return {key: self._get_default_explanation(q["user_answer"], q["correct_answer"]) for q, key in keyed_questions}
     
     def _get_question_key(self, question_info: dict) -> str:
         """Generate unique key for question"""
-        return f"{question_info['question_data']['id']}_{question_info['user_answer']}_{question_info['correct_answer']}"
+        return self._format_question_key(question_info['question_data']['id'], question_info['user_answer'], question_info['correct_answer'])
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _format_question_key(question_id: int, user_answer: str, correct_answer: str) -> str:
+        """Build the question key from its hashable parts"""
+        return f"{question_id}_{user_answer}_{correct_answer}"
     
-    def _get_default_explanation(self, user_answer: str, correct_answer: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _get_default_explanation(user_answer: str, correct_answer: str) -> str:
         """Generate a simple default explanation when AI is unavailable"""
         return f"""**თქვენი პასუხი:** {user_answer} ❌  
 **სწორი პასუხი:** {correct_answer} ✅
 
 💡 **რჩევა:** გადახედეთ სასწავლო მასალას ამ თემაზე."""
     
-    def _create_batch_prompt(self, incorrect_questions: list) -> str:
-        """Create batch prompt for multiple questions"""
-        option_labels = ['A', 'B', 'C', 'D']
-        
-        questions_text = ""
+    def _create_batch_prompt(self, incorrect_questions: list, include_preamble: bool = True) -> str:
+        """Create batch prompt for multiple questions (without the static preamble when it is context-cached)"""
+        # One compact JSON line per question; field names are explained once in the preamble
+        lines = []
         for i, q_info in enumerate(incorrect_questions, 1):
             question = q_info["question_data"]
-            user_answer = q_info["user_answer"]
-            correct_answer = q_info["correct_answer"]
-            
-            options_text = ""
-            for j, option in enumerate(question["options"]):
-                options_text += f"{option_labels[j]}. {option}\n"
-            
-            questions_text += f"""
----
-**კითხვა {i} (ID: {question['id']}):**
-{question['question']}
-
-**ვარიანტები:**
-{options_text}
-**მოსწავლის პასუხი:** {user_answer}
-**სწორი პასუხი:** {correct_answer}
-"""
+            lines.append(orjson.dumps({
+                "i": i,
+                "id": question["id"],
+                "q": question["question"],
+                "opts": {OPTION_LABELS[j]: option for j, option in enumerate(question["options"])},
+                "user": q_info["user_answer"],
+                "correct": q_info["correct_answer"]
+            }).decode())
+        questions_text = "\n".join(lines)
         
-        prompt = f"""თქვენ ხართ IT განათლების ექსპერტი და პროგრამირების ინსტრუქტორი. ქვემოთ მოცემული ყველა კითხვა დაკავშირებულია ინფორმაციულ ტექნოლოგიებთან, პროგრამირებასთან, კომპიუტერულ მეცნიერებასთან და ქსელურ ტექნოლოგიებთან.
-
-გთხოვთ ახსნათ ქართულ ენაზე რატომ არის არასწორი თითოეული მოცემული პასუხი, გამოიყენეთ IT ტერმინოლოგია და ტექნიკური ცოდნა.
-
-{questions_text}
-
-**მოთხოვნები:**
-1. თითოეული კითხვისთვის მოკლე, ლაკონური ახსნა
-2. მოიცავდეს რატომ არის სწორი სწორი პასუხი (IT ტექნიკური თვალსაზრისით)
-3. რატომ არის არასწორი მოსწავლის პასუხი (ტექნიკური განმარტებით)
-4. გამოიყენეთ markdown ფორმატირება
-5. მაქსიმუმ 2-3 წინადადება თითო კითხვაზე
-6. გამოიყენეთ ქართული IT ტერმინოლოგია და ტექნიკური ენა
-
-**ფორმატი:**
-```
-### კითხვა 1 (ID: X)
-**სწორი პასუხი (Y):** [IT ტექნიკური ახსნა]
-**რატომაა არასწორი (Z):** [ტექნიკური განმარტება]
-
-### კითხვა 2 (ID: X)
-...
-```"""
+        if not include_preamble:
+            return questions_text
         
-        return prompt
+        return f"{_BATCH_PREAMBLE}\n{questions_text}"
     
-    def _parse_batch_response(self, ai_response: str, incorrect_questions: list) -> dict:
+    def _parse_batch_response(self, ai_response: str, keyed_questions: list) -> dict:
         """Parse AI response and map to question keys"""
         explanations = {}
         
-        # Split response by question sections
-        sections = ai_response.split("### კითხვა")
+        by_id = {q["question_data"]["id"]: (q, key) for q, key in keyed_questions}
         
-        for i, section in enumerate(sections[1:], 1):  # Skip first empty section
-            try:
-                # Extract question ID from section
-                id_match = section.split("(ID: ")[1].split(")")[0] if "(ID: " in section else None
-                
-                if id_match:
-                    question_id = int(id_match)
-                    # Find matching question
-                    for q_info in incorrect_questions:
-                        if q_info["question_data"]["id"] == question_id:
-                            key = self._get_question_key(q_info)
-                            # Clean up the explanation text
-                            explanation = f"### კითხვა {i} (ID: {question_id})\n" + section.split(f"(ID: {question_id})")[1].strip()
-                            explanations[key] = explanation
-                            break
-            except Exception as e:
-                print(f"Error parsing question section {i}: {e}")
-                continue
+        # Single pass over the response, one match per question section
+        for i, m in enumerate(_SECTION_RE.finditer(ai_response), 1):
+            question_id = int(m.group(2))
+            match = by_id.get(question_id)
+            if match:
+                # Clean up the explanation text
+                explanations[match[1]] = f"### კითხვა {m.group(1) or i} (ID: {question_id})\n{m.group(3).strip()}"
         
         # Fill in default explanations for any missing questions
-        for q_info in incorrect_questions:
-            key = self._get_question_key(q_info)
+        for q_info, key in by_id.values():
             if key not in explanations:
                 explanations[key] = self._get_default_explanation(q_info["user_answer"], q_info["correct_answer"])
         
@@ -219,14 +388,11 @@ class AIExplanationService:
         old_questions = self.total_questions_processed
         self.request_count = 0
         self.total_questions_processed = 0
-        logger.info(f"🔄 STATISTICS RESET: {old_count} requests, {old_questions} questions")
+        logger.info("🔄 STATISTICS RESET: %d requests, %d questions", old_count, old_questions)
     
     def _create_prompt(self, question: str, options: list, user_answer: str, correct_answer: str) -> str:
         """Create a prompt for AI explanation generation"""
-        option_labels = ['A', 'B', 'C', 'D']
-        options_text = ""
-        for i, option in enumerate(options):
-            options_text += f"{option_labels[i]}. {option}\n"
+        options_text = "".join(f"{OPTION_LABELS[i]}. {option}\n" for i, option in enumerate(options))
         
         prompt = f"""თქვენ ხართ განათლების ექსპერტი. გთხოვთ ახსნათ ქართულ ენაზე რატომ არის არასწორი მოცემული პასუხი და რატომ არის სწორი სწორი პასუხი.
 
@@ -11,6 +11,20 @@ QUIZ_DATA_FILE = os.getenv("QUIZ_DATA_FILE", "quiz_example.json")
 
 ENABLE_AI_EXPLANATIONS = os.getenv("ENABLE_AI_EXPLANATIONS", "True").lower() == "true"
 
+# Persistent cache for generated AI explanations
+AI_CACHE_FILE = os.getenv("AI_CACHE_FILE", "ai_cache.sqlite")
+
 # API Settings
 GEMINI_MODEL = "gemini-2.0-flash-exp"
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent" 
\ No newline at end of file
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent"
+
+# Explicit context caching of the static prompt preamble
+ENABLE_CONTEXT_CACHE = os.getenv("ENABLE_CONTEXT_CACHE", "True").lower() == "true"
+GEMINI_CACHE_URL = "https://generativelanguage.googleapis.com/v1beta/cachedContents"
+GEMINI_CACHE_TTL = os.getenv("GEMINI_CACHE_TTL", "3600s")
+
+# Max questions per Gemini request; larger batches are sent as parallel requests
+GEMINI_BATCH_SIZE = max(1, int(os.getenv("GEMINI_BATCH_SIZE", "10")))
+
+# Answer option letters by option index; covers more options than any quiz question has
+OPTION_LABELS = tuple(chr(ord("A") + i) for i in range(26))
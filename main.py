@@ -1,18 +1,40 @@
+import hashlib
+import logging
 import os
+import sqlite3
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-import json
+import orjson
+import aiofiles
+import aiofiles.os
 from typing import List, Optional
 import asyncio
 from ai_service import ai_service
+from config import OPTION_LABELS
+from scoring import score
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Setup logging (uvicorn --log-level only affects uvicorn's own loggers; use LOG_LEVEL=DEBUG here)
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(levelname)s:%(name)s:%(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+# uvicorn creates the event loop before importing this module, so the loop is chosen at launch:
+#   uvicorn main:app --loop uvloop --http httptools
+# (uvloop ships with uvicorn[standard]; the default --loop auto also picks it when installed)
+
 QUIZ_DATA_FILE = os.getenv("QUIZ_DATA_FILE", "quiz_example.json")
+ANSWERS_DB_FILE = os.getenv("ANSWERS_DB_FILE", f"{os.path.splitext(QUIZ_DATA_FILE)[0]}_answers.sqlite")
 app = FastAPI(title="Quiz Application", description="Georgian Programming Quiz")
 
 # Pydantic models
@@ -34,43 +56,76 @@ class DetailedResult(BaseModel):
     is_correct: bool
     ai_explanation: Optional[str] = None
 
+# Answer letter -> option index lookup table (0xFF marks an invalid letter)
+_LETTER_INDEX = bytearray(b"\xff" * 256)
+for _i, _c in enumerate(OPTION_LABELS):
+    _LETTER_INDEX[ord(_c)] = _i
+    _LETTER_INDEX[ord(_c.lower())] = _i
+
+def letter_index(letter: str) -> int:
+    """Map an answer letter to its option index, or 0xFF if it is not a valid letter"""
+    if len(letter) != 1 or ord(letter) > 0xFF:
+        return 0xFF
+    return _LETTER_INDEX[ord(letter)]
+
+# Parsed quiz data, reloaded only when the file changes on disk
+_quiz_cache = {"mtime": 0, "data": None, "clean_bytes": b"", "etag": ""}
+_id_index: dict[int, dict] = {}
+
 # Load quiz data
-def load_quiz_data():
+async def load_quiz_data():
     try:
-        with open(f"{QUIZ_DATA_FILE}", "r", encoding="utf-8") as file:
-            return json.load(file)
+        st = await aiofiles.os.stat(QUIZ_DATA_FILE)
+        if st.st_mtime != _quiz_cache["mtime"]:
+            async with aiofiles.open(f"{QUIZ_DATA_FILE}", "rb") as file:
+                _quiz_cache["data"] = orjson.loads(await file.read())
+            _quiz_cache["mtime"] = st.st_mtime
+            _id_index.clear()
+            _id_index.update((q["id"], q) for q in _quiz_cache["data"])
+            # Precompute the /api/quiz payload (without correct answers) and its ETag
+            clean = [{"id": q["id"], "question": q["question"], "options": q["options"]} for q in _quiz_cache["data"]]
+            _quiz_cache["clean_bytes"] = orjson.dumps(clean)
+            _quiz_cache["etag"] = f'"{hashlib.md5(_quiz_cache["clean_bytes"]).hexdigest()}"'
+        return _quiz_cache["data"]
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz data not found")
 
-# Save quiz data
-def save_quiz_data(data):
-    with open(f"{QUIZ_DATA_FILE}", "w", encoding="utf-8") as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
+async def get_question_by_id(question_id: int):
+    """Look up a question by ID using the in-memory index"""
+    await load_quiz_data()
+    return _id_index.get(question_id)
+
+# User answers are stored separately from the (immutable) quiz questions
+_answers_db = sqlite3.connect(ANSWERS_DB_FILE, check_same_thread=False)
+_answers_db.execute("CREATE TABLE IF NOT EXISTS answers(question_id INTEGER PRIMARY KEY, answer TEXT)")
+_answers_db.commit()
+
+# Load user answers
+def load_user_answers():
+    return dict(_answers_db.execute("SELECT question_id, answer FROM answers"))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared AI HTTP session"""
+    await ai_service.close()
 
 @app.get("/")
 async def root():
     return FileResponse("static/index.html")
 
 @app.get("/api/quiz")
-async def get_quiz():
+async def get_quiz(request: Request):
     """Get all quiz questions without correct answers"""
-    quiz_data = load_quiz_data()
-    # Remove correct answers from response for security
-    clean_quiz = []
-    for question in quiz_data:
-        clean_question = {
-            "id": question["id"],
-            "question": question["question"],
-            "options": question["options"]
-        }
-        clean_quiz.append(clean_question)
-    return clean_quiz
+    await load_quiz_data()
+    etag = _quiz_cache["etag"]
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=_quiz_cache["clean_bytes"], media_type="application/json", headers={"ETag": etag})
 
 @app.get("/api/quiz/{question_id}")
 async def get_question(question_id: int):
     """Get specific question by ID"""
-    quiz_data = load_quiz_data()
-    question = next((q for q in quiz_data if q["id"] == question_id), None)
+    question = await get_question_by_id(question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
@@ -83,22 +138,17 @@ async def get_question(question_id: int):
 @app.get("/api/quiz/{question_id}/correct-answer")
 async def get_correct_answer(question_id: int):
     """Get correct answer for a specific question (for quick answer feature)"""
-    quiz_data = load_quiz_data()
-    question = next((q for q in quiz_data if q["id"] == question_id), None)
+    question = await get_question_by_id(question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
     correct_answer = question.get("correct", [""])[0]
     correct_text = ""
 
-    if correct_answer and question.get("options"):
-        try:
-            # Convert A, B, C, D to 0, 1, 2, 3
-            option_index = ord(correct_answer) - ord("A")
-            if 0 <= option_index < len(question["options"]):
-                correct_text = question["options"][option_index]
-        except (IndexError, ValueError):
-            pass
+    # Convert A, B, C, ... to 0, 1, 2, ... (0xFF for anything else)
+    option_index = letter_index(correct_answer)
+    if option_index < len(question.get("options", ())):
+        correct_text = question["options"][option_index]
 
     return {
         "id": question_id,
@@ -109,73 +159,30 @@ async def get_correct_answer(question_id: int):
 @app.post("/api/quiz/{question_id}/answer")
 async def submit_answer(question_id: int, answer: Answer):
     """Submit answer for a specific question"""
-    quiz_data = load_quiz_data()
-    question = next((q for q in quiz_data if q["id"] == question_id), None)
+    question = await get_question_by_id(question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
-    # Save user answer (create field if it doesn't exist)
-    if "user_answer" not in question:
-        question["user_answer"] = []
-    question["user_answer"] = [answer.answer]
-    save_quiz_data(quiz_data)
+    option_index = letter_index(answer.answer)
+    if option_index >= len(question["options"]):
+        raise HTTPException(status_code=400, detail="Invalid answer")
+    # Normalize to the upper-case option letter used by correct answers
+    user_answer = OPTION_LABELS[option_index]
+
+    # Save user answer (single row write instead of rewriting the quiz file)
+    _answers_db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?)", (question_id, user_answer))
+    _answers_db.commit()
 
-    return {"message": "Answer submitted successfully", "answer": answer.answer}
+    return {"message": "Answer submitted successfully", "answer": user_answer}
 
 @app.get("/api/results")
 async def get_results():
-    """Get quiz results with correct answers and AI explanations"""
-    quiz_data = load_quiz_data()
+    """Get quiz results with correct answers (AI explanations are streamed via /api/results/explanations)"""
+    quiz_data = await load_quiz_data()
+    user_answers = load_user_answers()
 
     total_questions = len(quiz_data)
-    correct_count = 0
-    detailed_results = []
-
-    # Collect all incorrect answers for batch AI processing
-    incorrect_questions = []
-
-    for question in quiz_data:
-        question_id = question["id"]
-        user_answer = question.get("user_answer", [])
-        correct_answer_list = question.get("correct", [])
-        correct_answer = correct_answer_list[0] if correct_answer_list else ""
-
-        is_correct = len(user_answer) > 0 and user_answer[0] == correct_answer
-        if is_correct:
-            correct_count += 1
-        else:
-            # Add to incorrect questions for AI explanation
-            # Only if user provided an answer AND it's wrong (not just unanswered)
-            if user_answer and len(user_answer) > 0:
-                incorrect_questions.append({
-                    "question_data": question,
-                    "user_answer": user_answer[0],
-                    "correct_answer": correct_answer
-                })
-
-        detailed_results.append({
-            "id": question_id,
-            "question": question["question"],
-            "options": question["options"],
-            "user_answer": user_answer[0] if user_answer else None,
-            "correct_answer": correct_answer,
-            "is_correct": is_correct,
-            "ai_explanation": None  # Will be filled later
-        })
-
-    # Generate AI explanations for incorrect answers
-    if incorrect_questions:
-        print(f"[MAIN] Starting AI explanation generation for {len(incorrect_questions)} questions")
-        explanations = await generate_ai_explanations(incorrect_questions)
-        print(f"[MAIN] AI explanation generation completed")
-
-        # Update detailed_results with AI explanations
-        for i, result in enumerate(detailed_results):
-            # Only add AI explanation if user gave a wrong answer (not if no answer given)
-            if not result["is_correct"] and result["user_answer"] is not None:
-                # Find matching explanation using the same key format as ai_service
-                explanation_key = f"{result['id']}_{result['user_answer']}_{result['correct_answer']}"
-                result["ai_explanation"] = explanations.get(explanation_key)
+    correct_count, detailed_results, _ = score(quiz_data, user_answers)
 
     percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0
 
@@ -186,28 +193,41 @@ async def get_results():
         detailed_results=detailed_results
     )
 
+@app.get("/api/results/explanations")
+async def get_results_explanations():
+    """Stream AI explanations for incorrect answers as Server-Sent Events"""
+    quiz_data = await load_quiz_data()
+    user_answers = load_user_answers()
+    _, _, incorrect_questions = score(quiz_data, user_answers)
+
+    return StreamingResponse(
+        generate_ai_explanations(incorrect_questions),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
 async def generate_ai_explanations(incorrect_questions):
-    """Generate AI explanations for incorrect answers using batch processing"""
-    print(f"[GENERATE_AI] Function called with {len(incorrect_questions)} questions")
+    """Generate AI explanations for incorrect answers, yielding an SSE event per completed batch"""
+    logger.debug("[GENERATE_AI] Function called with %d questions", len(incorrect_questions))
+
+    if incorrect_questions:
+        # Map ai_service keys back to question IDs for the frontend
+        key_to_id = {ai_service._get_question_key(q): q["question_data"]["id"] for q in incorrect_questions}
 
-    if not incorrect_questions:
-        print(f"[GENERATE_AI] No questions provided, returning empty dict")
-        return {}
+        logger.debug("[GENERATE_AI] Calling ai_service.stream_batch_explanations()")
+        async for explanations in ai_service.stream_batch_explanations(incorrect_questions):
+            logger.debug("[GENERATE_AI] Received %d explanations", len(explanations))
+            event = {key_to_id[key]: text for key, text in explanations.items() if key in key_to_id}
+            yield f"data: {orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS).decode()}\n\n"
 
-    # Use batch processing to get all explanations in one API call
-    print(f"[GENERATE_AI] Calling ai_service.get_batch_explanations()")
-    explanations = await ai_service.get_batch_explanations(incorrect_questions)
-    print(f"[GENERATE_AI] Received {len(explanations)} explanations")
-    return explanations
+    yield "event: done\ndata: {}\n\n"
 
 @app.post("/api/reset")
 async def reset_quiz():
     """Reset all user answers"""
-    quiz_data = load_quiz_data()
-    for question in quiz_data:
-        question["user_answer"] = []
-        # Don't reset correct answers - they should stay
-    save_quiz_data(quiz_data)
+    # Correct answers live in the quiz file and are not touched
+    _answers_db.execute("DELETE FROM answers")
+    _answers_db.commit()
     return {"message": "Quiz reset successfully"}
 
 @app.get("/api/ai-stats")
@@ -0,0 +1,45 @@
+from typing import Dict, List, Tuple
+
+# Pure, fully annotated scoring pass so it can be compiled ahead of time for
+# large quiz banks (`mypyc scoring.py`); it runs unchanged as plain Python.
+
+def score(quiz_data: List[dict], user_answers: Dict[int, str]) -> Tuple[int, List[dict], List[dict]]:
+    """Score user answers and build detailed results plus the incorrect-answer list for AI"""
+    correct_count = 0
+    detailed_results: List[dict] = []
+
+    # Collect all incorrect answers for batch AI processing
+    incorrect_questions: List[dict] = []
+
+    # Bind hot lookups to locals once instead of per iteration
+    _append_det = detailed_results.append
+    _append_inc = incorrect_questions.append
+    _get_answer = user_answers.get
+
+    for question in quiz_data:
+        question_id = question["id"]
+        u = _get_answer(question_id)
+        ca = (question.get("correct") or ("",))[0]
+        ok = u is not None and u == ca
+        if ok:
+            correct_count += 1
+
+        # Only if user provided an answer AND it's wrong (not just unanswered)
+        if not ok and u is not None:
+            _append_inc({
+                "question_data": question,
+                "user_answer": u,
+                "correct_answer": ca
+            })
+
+        _append_det({
+            "id": question_id,
+            "question": question["question"],
+            "options": question["options"],
+            "user_answer": u,
+            "correct_answer": ca,
+            "is_correct": ok,
+            "ai_explanation": None  # Will be filled later
+        })
+
+    return correct_count, detailed_results, incorrect_questions
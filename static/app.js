@@ -60,7 +60,8 @@ class QuizApp {
         const question = this.questions[this.currentQuestionIndex];
         const container = document.getElementById('question-container');
         
-        const optionLabels = ['A', 'B', 'C', 'D'];
+        // Option letters by index (A, B, C, ...), matching the backend's OPTION_LABELS
+        const optionLabels = question.options.map((_, index) => String.fromCharCode(65 + index));
         
         // Process question text to handle tables
         const processedQuestion = this.processQuestionWithTables(question.question);
@@ -298,6 +299,9 @@ class QuizApp {
             // Reorder results to match the shuffled question order
             const reorderedResults = this.reorderResultsToMatchQuestions(results);
             this.displayResults(reorderedResults);
+            
+            // AI explanations arrive separately and are filled in as they land
+            this.streamExplanations();
         } catch (error) {
             console.error('Error getting results:', error);
             this.showError('შედეგების მიღებისას მოხდა შეცდომა');
@@ -397,6 +401,48 @@ class QuizApp {
         this.detailedResults = results.detailed_results;
     }
     
+    streamExplanations() {
+        this.stopExplanationStream();
+        this.explanationsPending = true;
+        
+        const source = new EventSource('/api/results/explanations');
+        this.explanationSource = source;
+        
+        source.onmessage = (event) => {
+            const explanations = JSON.parse(event.data);
+            Object.entries(explanations).forEach(([id, explanation]) => {
+                const result = this.detailedResults.find(r => String(r.id) === id);
+                if (result) {
+                    result.ai_explanation = explanation;
+                }
+                
+                // Update the card in place if details are already rendered
+                const element = document.getElementById(`ai-explanation-${id}`);
+                if (element) {
+                    element.innerHTML = this.renderMarkdown(explanation);
+                }
+            });
+        };
+        
+        const finish = () => {
+            this.stopExplanationStream();
+            // Re-render to drop placeholders for explanations that never arrived
+            if (document.getElementById('detailed-results').style.display !== 'none') {
+                this.renderDetailedResults();
+            }
+        };
+        source.addEventListener('done', finish);
+        source.onerror = finish;
+    }
+    
+    stopExplanationStream() {
+        if (this.explanationSource) {
+            this.explanationSource.close();
+            this.explanationSource = null;
+        }
+        this.explanationsPending = false;
+    }
+    
     toggleDetailedResults() {
         const detailsDiv = document.getElementById('detailed-results');
         const btn = document.getElementById('show-details-btn');
@@ -413,7 +459,6 @@ class QuizApp {
     
     renderDetailedResults() {
         const container = document.getElementById('detailed-results');
-        const optionLabels = ['A', 'B', 'C', 'D'];
         
         container.innerHTML = this.detailedResults.map((result, index) => {
             const isCorrect = result.is_correct;
@@ -431,7 +476,7 @@ class QuizApp {
                         <p class="card-text">${result.question}</p>
                         <div class="options">
                             ${result.options.map((option, index) => {
-                                const optionLabel = optionLabels[index];
+                                const optionLabel = String.fromCharCode(65 + index);
                                 const isUserAnswer = result.user_answer === optionLabel;
                                 const isCorrectAnswer = result.correct_answer === optionLabel;
                                 
@@ -457,13 +502,15 @@ class QuizApp {
                                 სწორი პასუხი: <strong>${result.correct_answer}</strong>
                             </small>
                         </div>
-                        ${result.ai_explanation && !result.is_correct && result.user_answer ? `
+                        ${(result.ai_explanation || this.explanationsPending) && !result.is_correct && result.user_answer ? `
                             <div class="mt-3 p-3 bg-light border-left border-info rounded">
                                 <h6 class="text-info">
                                     <i class="fas fa-robot"></i> AI ახსნა:
                                 </h6>
-                                <div class="ai-explanation">
-                                    ${this.renderMarkdown(result.ai_explanation)}
+                                <div class="ai-explanation" id="ai-explanation-${result.id}">
+                                    ${result.ai_explanation
+                                        ? this.renderMarkdown(result.ai_explanation)
+                                        : '<i class="fas fa-spinner fa-spin"></i> იტვირთება...'}
                                 </div>
                             </div>
                         ` : ''}
@@ -485,6 +532,7 @@ class QuizApp {
             }
             
             // Reset local state
+            this.stopExplanationStream();
             this.currentQuestionIndex = 0;
             this.userAnswers = {};
             this.isQuizCompleted = false;
@@ -572,9 +620,10 @@ document.addEventListener('keydown', (e) => {
         case '2':
         case '3':
         case '4':
+        case '5':
             e.preventDefault();
             const optionIndex = parseInt(e.key) - 1;
-            const optionLabel = ['A', 'B', 'C', 'D'][optionIndex];
+            const optionLabel = String.fromCharCode(65 + optionIndex);
             const currentQuestion = window.app.questions[window.app.currentQuestionIndex];
             if (currentQuestion && optionIndex < currentQuestion.options.length) {
                 window.app.selectAnswer(currentQuestion.id, optionLabel);